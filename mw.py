@@ -16,14 +16,43 @@
 from __future__ import annotations
 from typing import List
 from pathlib import Path
-import base64
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from uuid import uuid4
 import streamlit as st
 import unicodedata
-import io, csv, re
+import hashlib
+import string
+import io, csv, json, shutil
+
+# pybase64 uses SIMD (SSSE3/AVX2/AVX-512) kernels and is a drop-in replacement
+# for the scalar stdlib encoder; fall back silently when it isn't installed.
+try:
+    from pybase64 import b64encode as _b64encode
+except Exception:
+    from base64 import b64encode as _b64encode
 
 # ---------------------- UI Config ----------------------
 st.set_page_config(page_title="Jupiter Points — Spelling Game", page_icon="🪐", layout="centered")
 
+# Bucket styling, shared by the page and the bucket component markup so the
+# rules are written once instead of per-injection.
+_GBAR_CSS = """
+  .gbar { width:80%; border-radius:3px; background:linear-gradient(180deg,#ffd54f,#fbc02d);
+          border:1px solid #b28900; box-shadow: 0 1px 2px rgba(0,0,0,0.15); }
+"""
+
+_BUCKET_CSS = """
+  .bucket-wrap { display:flex; align-items:center; gap:8px; margin:6px 0 10px 0; }
+  .bucket { position:relative; width:56px; height:56px; border-radius:6px; border:2px solid #999;
+            background:#f5f5f5; box-shadow: inset 0 0 8px rgba(0,0,0,0.08); overflow:hidden; }
+  .bucket-inner { position:absolute; left:6px; right:6px; bottom:6px; top:14px;
+                  display:flex; flex-direction:column-reverse; align-items:center; gap:2px; }
+  .bucket-lip { position:absolute; left:8px; right:8px; top:4px; height:6px; border-radius:3px;
+                background:linear-gradient(180deg,#ddd,#bbb); border:1px solid #aaa; }
+  .bucket-label { font-weight:600; }
+""" + _GBAR_CSS
+
 # tighten space after captions, and compact controls box/buttons
 st.markdown(
     """
@@ -38,7 +67,8 @@ st.markdown(
     .controls-box .st-emotion-cache-ocqkz7, /* Streamlit column wrapper (may vary by version) */
     .controls-box [data-testid="stHorizontalBlock"] { gap: 0.25rem !important; }
     </style>
-    """,
+    """
+    + f"<style>{_BUCKET_CSS}</style>",
     unsafe_allow_html=True,
 )
 
@@ -49,219 +79,471 @@ DEFAULT_WORDS: List[str] = [
     "are", "buy", "little", "said", "too", "up", "will", "you",
 ]
 
+# ---------------------- Page-level JS helpers ----------------------
+# One persistent helper module installed on the parent window. Every audio /
+# speech action used to inject its own full <script> iframe per click; now the
+# logic lives in window._mw (defined once, in the parent realm so it outlives
+# component iframes) and each action ships only a tiny mw.xxx(...) call.
+_MW_HELPERS_HTML = """
+<script type="text/plain" id="mw-src">
+window._mw = (function() {
+  var audioCache = {};
+  function getAudio(src) { return audioCache[src] || (audioCache[src] = new Audio(src)); }
+  function playOnce(src, rate) {
+    var a = getAudio(src);
+    a.playbackRate = rate || 1.0; a.currentTime = 0;
+    a.play().catch(function(){});
+  }
+  function playLoopEl(src, times, gap, rate) {
+    var a = getAudio(src);
+    a.playbackRate = rate || 1.0;
+    if (a._mwOnEnded) a.removeEventListener('ended', a._mwOnEnded);
+    var count = 0;
+    a._mwOnEnded = function() {
+      count += 1;
+      if (count < times) { setTimeout(function() { a.currentTime = 0; a.play(); }, gap); }
+    };
+    a.addEventListener('ended', a._mwOnEnded);
+    a.currentTime = 0;
+    a.play().catch(function(){});
+  }
+  var bufferCache = {};
+  var actx = null;
+  function getCtx() {
+    var Ctx = window.AudioContext || window.webkitAudioContext;
+    actx = actx || new Ctx();
+    if (actx.state === 'suspended') { actx.resume().catch(function(){}); }
+    return actx;
+  }
+  function playLoop(src, times, gap, rate) {
+    // Decode once via Web Audio and schedule every repeat from the same
+    // AudioBuffer — no re-decode between plays. Fall back to the
+    // HTMLAudioElement chain if fetch/decode fails (e.g. data: URI quirks).
+    try {
+      var ctx = getCtx();
+      var r = rate || 1.0;
+      var ready = bufferCache[src] || (bufferCache[src] = fetch(src)
+        .then(function(resp) { return resp.arrayBuffer(); })
+        .then(function(buf) { return ctx.decodeAudioData(buf); }));
+      ready.then(function(decoded) {
+        var t = ctx.currentTime + 0.02;
+        var dur = decoded.duration / r;
+        for (var i = 0; i < times; i++) {
+          var s = ctx.createBufferSource();
+          s.buffer = decoded;
+          s.playbackRate.value = r;
+          s.connect(ctx.destination);
+          s.start(t + i * (dur + gap / 1000));
+        }
+      }).catch(function() { delete bufferCache[src]; playLoopEl(src, times, gap, rate); });
+    } catch (e) { playLoopEl(src, times, gap, rate); }
+  }
+  function speakSeq(parts, rate, gap, pitch) {
+    var i = 0;
+    function one() {
+      if (i >= parts.length) return;
+      var u = new SpeechSynthesisUtterance(parts[i]);
+      u.lang = 'en-US'; u.rate = rate; u.pitch = (pitch == null ? 1.0 : pitch);
+      u.onend = function() { i += 1; setTimeout(one, gap); };
+      speechSynthesis.speak(u);
+    }
+    try { speechSynthesis.cancel(); } catch (e) {}
+    one();
+  }
+  function sayRepeat(text, times, rate, gap) {
+    var parts = []; for (var i = 0; i < times; i++) parts.push(text);
+    speakSeq(parts, rate, gap);
+  }
+  function saySentence(text, delay, rate) {
+    try { speechSynthesis.cancel(); } catch (e) {}
+    setTimeout(function() { speakSeq([text], rate, 0, 0.95); }, Math.max(30, delay));
+  }
+  function sayLetters(lettersText, gap, rate) { speakSeq(lettersText.split(' '), rate, gap); }
+  function sayClear(target, tokens, gap, rate, preRepeat) {
+    var parts = []; for (var i = 0; i < preRepeat; i++) parts.push(target);
+    speakSeq(parts.concat(tokens), rate, gap);
+  }
+  function sayFeedback(text, rate) { speakSeq([text], rate, 0); }
+  function sfxBeep() {
+    try {
+      var Ctx = window.AudioContext || window.webkitAudioContext;
+      var ctx = new Ctx();
+      if (ctx.state === 'suspended') { ctx.resume().catch(function(){}); }
+      function tone(f, t, startDelay) {
+        var o = ctx.createOscillator();
+        var g = ctx.createGain();
+        o.type = 'square'; o.frequency.value = f; o.connect(g); g.connect(ctx.destination);
+        var now = ctx.currentTime + (startDelay || 0);
+        g.gain.setValueAtTime(0.0001, now);
+        g.gain.exponentialRampToValueAtTime(0.35, now + 0.02);
+        g.gain.exponentialRampToValueAtTime(0.0001, now + t);
+        o.start(now); o.stop(now + t + 0.02);
+      }
+      // three-note 'cha-ching' impression with small delays
+      tone(880, 0.10, 0.16);
+      tone(1318.5, 0.14, 0.30);
+      tone(1976.0, 0.10, 0.46);
+    } catch (e) {}
+  }
+  function sfx(src, rate) {
+    if (!src) { sfxBeep(); return; }
+    var a = getAudio(src);
+    a.playbackRate = rate || 1.0; a.volume = 1.0;
+    // small delay so it doesn't collide with speech/confetti setup
+    setTimeout(function() {
+      a.currentTime = 0; a.play().catch(function(){});
+      setTimeout(function() { a.currentTime = 0; a.play().catch(function(){}); }, 350);
+    }, 180);
+  }
+  function confettiBurst() {
+    try {
+      if (!window.confetti) return;  // library still loading; skip quietly
+      // main burst
+      confetti({ particleCount: 120, spread: 70, origin: { y: 0.6 } });
+      // secondary burst for fuller feel
+      setTimeout(function() { confetti({ particleCount: 90, spread: 100, startVelocity: 45, origin: { y: 0.7 } }); }, 200);
+    } catch (e) {}
+  }
+  function goldBarDrop() {
+    // DOM mutation batched into the next animation frame
+    requestAnimationFrame(function() {
+      try {
+        var bucket = document.getElementById('bucket');
+        if (!bucket) return;
+        var rect = bucket.getBoundingClientRect();
+        var bar = document.createElement('div');
+        bar.style.cssText = 'position:fixed;width:32px;height:14px;border-radius:3px;' +
+          'background:linear-gradient(180deg,#ffd54f,#fbc02d);border:1px solid #b28900;' +
+          'box-shadow:0 2px 6px rgba(0,0,0,0.25);z-index:9999;' +
+          'left:' + (rect.left + rect.width/2 - 16) + 'px;top:' + (rect.top - 20) + 'px;';
+        document.body.appendChild(bar);
+        bar.animate([{ transform:'translateY(-120px)', opacity:0.9 },
+                     { transform:'translateY(0)', opacity:1 }],
+                    { duration: 550, easing: 'cubic-bezier(.2,.7,.2,1)' });
+        setTimeout(function() { bar.remove(); }, 600);
+      } catch (e) {}
+    });
+  }
+  function bucketAdd(cap, barH, current) {
+    // Diff the stacked bars against `current` and append only the missing
+    // ones, inside one animation frame (covers both add and sync cases).
+    // `cap` and `barH` arrive precomputed from Python.
+    requestAnimationFrame(function() {
+      try {
+        var bucket = document.getElementById('bucket');
+        if (!bucket) return;
+        var inner = bucket.querySelector('.bucket-inner');
+        var label = document.querySelector('.bucket-label');
+        var target = Math.min(current, cap);
+        var have = inner ? inner.children.length : 0;
+        while (inner && have < target) {
+          var b = document.createElement('div');
+          b.className = 'gbar';
+          b.style.height = barH + 'px';
+          inner.prepend(b);
+          have++;
+        }
+        if (label) { label.textContent = 'Jupiter Dollars in bucket: ' + current; }
+      } catch (e) {}
+    });
+  }
+  return { playOnce: playOnce, playLoop: playLoop, sayRepeat: sayRepeat,
+           saySentence: saySentence, sayLetters: sayLetters, sayClear: sayClear,
+           sayFeedback: sayFeedback, sfx: sfx, confetti: confettiBurst,
+           goldBarDrop: goldBarDrop, bucketAdd: bucketAdd };
+})();
+</script>
+<script>
+  (function() {
+    try {
+      var P = window.parent;
+      if (P._mw) return;  // already installed by an earlier run
+      var s = P.document.createElement('script');
+      s.textContent = document.getElementById('mw-src').textContent;
+      P.document.head.appendChild(s);
+      // load canvas-confetti once into the page instead of per burst
+      if (!P.document.getElementById('mw-confetti-lib')) {
+        var c = P.document.createElement('script');
+        c.id = 'mw-confetti-lib';
+        c.src = '__CONFETTI_SRC__';
+        P.document.head.appendChild(c);
+      }
+    } catch (e) {}
+  })();
+</script>
+"""
+
+
+# Drop confetti.browser.min.js into static/ (e.g. at deploy time) to serve the
+# library from this server; otherwise it comes from the CDN.
+_CONFETTI_LOCAL = Path(__file__).parent / "static" / "confetti.browser.min.js"
+_CONFETTI_CDN = "https://cdn.jsdelivr.net/npm/canvas-confetti@1.6.0/dist/confetti.browser.min.js"
+
+
+def _confetti_src() -> str:
+    if _CONFETTI_LOCAL.exists():
+        return "/app/static/confetti.browser.min.js"
+    return _CONFETTI_CDN
+
+
+def _install_mw_helpers():
+    # Constant payload; the install script itself no-ops once _mw exists
+    st.components.v1.html(
+        _MW_HELPERS_HTML.replace("__CONFETTI_SRC__", _confetti_src()), height=0
+    )
+
+
+# mw.* calls queued during the current run; flushed as ONE component at the
+# end of the script (or of the enclosing fragment — a fragment rerun never
+# reaches the end of the script, so fragments flush for themselves). Calls
+# stashed just before an app-scope rerun (which rebinds this list) are
+# re-queued here on the next run.
+_mw_pending: list[str] = []
+_mw_pending.extend(st.session_state.pop("_mw_carryover", []))
+
+def _mw_call(call_js: str):
+    """Queue a window._mw invocation for the end-of-run flush."""
+    _mw_pending.append(call_js)
+
+def _flush_mw_calls():
+    """Emit every queued mw.* call as a single height-0 component.
+
+    One iframe per rerun instead of one per action. The per-flush seq
+    doubles as an idempotency key: the parent window remembers which seqs
+    have already fired, so if Streamlit re-mounts an identical payload
+    (double-rerun races, browser back/forward restores) the audio does not
+    play twice.
+    """
+    if not _mw_pending:
+        return
+    call_js = " ".join(_mw_pending)
+    _mw_pending.clear()
+    # __mwDone lives in the browser tab and outlives session_state.clear()
+    # (Clear & Load), so a bare counter would reuse already-fired keys and
+    # the payloads would be silently skipped. Pair the counter with a random
+    # session nonce that changes whenever session_state is wiped.
+    ns = st.session_state.get("_mw_ns")
+    if ns is None:
+        ns = st.session_state["_mw_ns"] = uuid4().hex
+    seq = st.session_state.get("_mw_seq", 0) + 1
+    st.session_state["_mw_seq"] = seq
+    key = json.dumps(f"{ns}:{seq}")
+    st.components.v1.html(
+        f"""
+        <script>
+          /* key:{ns}:{seq} — unique per flush so Streamlit re-runs the payload */
+          (function() {{
+            var tries = 0;
+            (function go() {{
+              var P = null, mw = null;
+              try {{ P = window.parent; mw = P._mw; }} catch (e) {{}}
+              if (mw) {{
+                var done = P.__mwDone = P.__mwDone || {{}};
+                if (done[{key}]) return;
+                done[{key}] = 1;
+                try {{ {call_js} }} catch (e) {{}}
+                return;
+              }}
+              if (tries++ < 40) setTimeout(go, 50);
+            }})();
+          }})();
+        </script>
+        """,
+        height=0,
+    )
+
 # ---------------------- Local Audio (MW scraped/downloaded or TTS) ----------------------
 AUDIO_DIR_DEFAULT = Path(__file__).parent / "audio_tts"  # default folder for your mp3s
 AUDIO_EXTS = (".mp3", ".wav", ".m4a")
 
+_MIME = {".mp3": "audio/mpeg", ".wav": "audio/wav", ".m4a": "audio/mp4"}
+
+
+# Static serving (see .streamlit/config.toml): files copied under static/ are
+# reachable at /app/static/..., so the browser can fetch + cache the mp3 itself
+# instead of us inlining a base64 data URI into every component (~33% bigger and
+# re-shipped on every rerun).
+STATIC_AUDIO_DIR = Path(__file__).parent / "static" / "audio"
+
+
+def _static_audio_url(path: Path) -> str | None:
+    """Mirror `path` into static/audio/ and return its /app/static URL (None on failure)."""
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+        dest = STATIC_AUDIO_DIR / path.name
+        if not dest.exists() or dest.stat().st_mtime_ns != mtime_ns:
+            STATIC_AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, dest)
+        # mtime query string busts the browser cache when the file changes
+        return f"/app/static/audio/{dest.name}?v={mtime_ns}"
+    except Exception:
+        return None
+
+
+def _audio_src(path: Path) -> str | None:
+    """Best playback src for a local file: static URL, else base64 data URI."""
+    url = _static_audio_url(path)
+    if url is not None:
+        return url
+    try:
+        stat = path.stat()
+        mime, b64 = _encoded_audio(str(path), stat.st_mtime_ns, stat.st_size)
+    except Exception:
+        return None
+    return f"data:{mime};base64,{b64}"
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _encoded_audio(path_str: str, mtime_ns: int, size: int) -> tuple[str, str]:
+    # Read + base64-encode once per (file, mtime, size); reruns reuse the cached
+    # string. max_entries bounds memory for very large custom audio folders.
+    p = Path(path_str)
+    mime = _MIME.get(p.suffix.lower(), "audio/mp4")
+    return mime, _b64encode(p.read_bytes()).decode("ascii")
+
 SENT_AUDIO_DIR_DEFAULT = Path(__file__).parent / "audio_sentences"
 
+@st.cache_resource(show_spinner=False)
+def _dir_path(p: str) -> Path:
+    # One Path object per configured folder string, shared across reruns
+    return Path(p)
+
+
 def get_sentence_audio_dir() -> Path:
     p = st.session_state.get("sentence_audio_dir")
     try:
-        return Path(p) if p else SENT_AUDIO_DIR_DEFAULT
+        return _dir_path(p) if p else SENT_AUDIO_DIR_DEFAULT
     except Exception:
         return SENT_AUDIO_DIR_DEFAULT
 
 
+@st.cache_data(show_spinner=False)
+def _index_audio_dir(dir_str: str, mtime_ns: int) -> dict[str, str]:
+    """One directory walk -> {lowercased filename: path}; mtime key re-indexes on change."""
+    index: dict[str, str] = {}
+    try:
+        for p in sorted(Path(dir_str).iterdir()):
+            if p.suffix.lower() in AUDIO_EXTS:
+                index.setdefault(p.name.lower(), str(p))
+    except OSError:
+        pass
+    return index
+
+
+def _dir_index(base: Path) -> dict[str, str] | None:
+    # Single stat() covers both the old .exists() probe and cache invalidation
+    try:
+        mtime_ns = base.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _index_audio_dir(str(base), mtime_ns)
+
+
 def find_local_sentence_audio(word: str) -> Path | None:
-    base = get_sentence_audio_dir()
-    if not base.exists():
+    index = _dir_index(get_sentence_audio_dir())
+    if not index:
         return None
     wl = word.lower()
     # prefer explicit "_sentence" name first
     for ext in AUDIO_EXTS:
-        p = base / f"{wl}_sentence{ext}"
-        if p.exists():
-            return p
+        hit = index.get(f"{wl}_sentence{ext}")
+        if hit:
+            return Path(hit)
     # fallback to "word.ext"
     for ext in AUDIO_EXTS:
-        p = base / f"{wl}{ext}"
-        if p.exists():
-            return p
+        hit = index.get(f"{wl}{ext}")
+        if hit:
+            return Path(hit)
     # looser matches
     for ext in AUDIO_EXTS:
-        for p in base.glob(f"{wl}*{ext}"):
-            return p
+        for name, p in index.items():
+            if name.startswith(wl) and name.endswith(ext):
+                return Path(p)
     return None
 
 def play_local_audio_once(path: Path, playback_rate: float = 1.0):
-    ext = path.suffix.lower()
-    mime = (
-        "audio/mpeg" if ext == ".mp3" else
-        "audio/wav"  if ext == ".wav" else
-        "audio/mp4"
-    )
-    try:
-        b64 = base64.b64encode(path.read_bytes()).decode("utf-8")
-    except Exception:
+    src = _audio_src(path)
+    if src is None:
         st.warning(f"Couldn't read sentence audio file: {path}")
         return
-    st.components.v1.html(
-        f"""
-        <script>
-          (function() {{
-            var rate = {playback_rate};
-            var src = 'data:{mime};base64,{b64}';
-            var audio = new Audio(src);
-            audio.playbackRate = rate;
-            audio.play();
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+    _mw_call(f"mw.playOnce({json.dumps(src)}, {playback_rate});")
 
 # ---------------------- UI Sounds (optional local SFX) ----------------------
 SFX_DIR_DEFAULT = Path(__file__).parent / "audio_ui"
 SFX_EXTS = (".mp3", ".wav", ".m4a")
 
 def find_ui_sound(name: str) -> Path | None:
-    base = SFX_DIR_DEFAULT
-    try:
-        # try exact name
-        for ext in SFX_EXTS:
-            p = base / f"{name}{ext}"
-            if p.exists():
-                return p
-        # try common variants for cha-ching
-        variants = [
-            name.replace("-","_"), name.replace("_","-"),
-            "cha_ching", "cha-ching", "cash", "register", "cash_register", "success"
-        ]
-        for v in variants:
-            for ext in SFX_EXTS:
-                p = base / f"{v}{ext}"
-                if p.exists():
-                    return p
-    except Exception:
+    index = _dir_index(SFX_DIR_DEFAULT)
+    if not index:
         return None
+    # exact name first, then common variants for cha-ching
+    variants = [
+        name, name.replace("-", "_"), name.replace("_", "-"),
+        "cha_ching", "cha-ching", "cash", "register", "cash_register", "success"
+    ]
+    for v in variants:
+        for ext in SFX_EXTS:
+            hit = index.get(f"{v}{ext}")
+            if hit:
+                return Path(hit)
     return None
 
-def play_ui_sound(name: str, rate: float = 1.0):
-    """Play a short UI sound from audio_ui/ if available; fallback to a simple web-audio beep.
-    We delay playback slightly to avoid being swallowed by simultaneous speech/visual scripts.
+def _sfx_js(name: str, rate: float = 1.0) -> str:
+    """mw.sfx call for a short UI sound from audio_ui/ (null src -> beep).
+
+    mw.sfx delays playback slightly to avoid being swallowed by
+    simultaneous speech/visual scripts.
     """
     path = find_ui_sound(name)
-    if path is not None:
-        ext = path.suffix.lower()
-        mime = (
-            "audio/mpeg" if ext == ".mp3" else
-            "audio/wav"  if ext == ".wav" else
-            "audio/mp4"
-        )
-        try:
-            b64 = base64.b64encode(path.read_bytes()).decode("utf-8")
-            st.components.v1.html(
-                f"""
-                <script>
-                  (function() {{
-                    var src = 'data:{mime};base64,{b64}';
-                    var a = new Audio(src);
-                    a.playbackRate = {rate};
-                    a.volume = 1.0;
-                    // small delay so it doesn't collide with speech/confetti setup
-                    setTimeout(function() {{
-                      a.play().catch(function(_ ){{}});
-                      setTimeout(function(){{ a.play().catch(function(_ ){{}}); }}, 350);
-                    }}, 180);
-                  }})();
-                </script>
-                """,
-                height=0,
-            )
-            return
-        except Exception:
-            pass
-    # fallback: louder web-audio triad with context resume
-    st.components.v1.html(
-        """
-        <script>
-          (function(){
-            try {
-              const Ctx = window.AudioContext || window.webkitAudioContext;
-              const ctx = new Ctx();
-              if (ctx.state === 'suspended') { ctx.resume().catch(()=>{}); }
-              function tone(f, t, startDelay){
-                const o = ctx.createOscillator();
-                const g = ctx.createGain();
-                o.type = 'square'; o.frequency.value = f; o.connect(g); g.connect(ctx.destination);
-                const now = ctx.currentTime + (startDelay||0);
-                g.gain.setValueAtTime(0.0001, now);
-                g.gain.exponentialRampToValueAtTime(0.35, now+0.02);
-                g.gain.exponentialRampToValueAtTime(0.0001, now+t);
-                o.start(now); o.stop(now+t+0.02);
-              }
-              // three-note 'cha-ching' impression with small delays
-              tone(880, 0.10, 0.16);
-              tone(1318.5, 0.14, 0.30);
-              tone(1976.0, 0.10, 0.46);
-            } catch(e){}
-          })();
-        </script>
-        """,
-        height=0,
-    )
+    src = _audio_src(path) if path is not None else None
+    return f"mw.sfx({json.dumps(src)}, {rate});"
 
 def get_audio_dir() -> Path:
     p = st.session_state.get("audio_dir")
     try:
-        return Path(p) if p else AUDIO_DIR_DEFAULT
+        return _dir_path(p) if p else AUDIO_DIR_DEFAULT
     except Exception:
         return AUDIO_DIR_DEFAULT
 
-def find_local_audio_for_word(word: str) -> Path | None:
-    base = get_audio_dir()
-    if not base.exists():
-        return None
-    wl = word.lower()
+@st.cache_data(show_spinner=False, max_entries=1024)
+def _find_local_audio_cached(wl: str, dir_str: str, mtime_ns: int) -> str | None:
+    """Resolve a word to a file in the (cached) directory index.
+
+    The exact-name probe is a dict hit already; this memoizes the
+    prefix/substring fallback scans so each word is resolved at most once
+    per directory state instead of on every rerun.
+    """
+    index = _index_audio_dir(dir_str, mtime_ns)
     for ext in AUDIO_EXTS:
-        p = base / f"{wl}{ext}"
-        if p.exists():
-            return p
+        hit = index.get(f"{wl}{ext}")
+        if hit:
+            return hit
     for ext in AUDIO_EXTS:
-        for p in base.glob(f"{wl}*{ext}"):
-            return p
+        for name, p in index.items():
+            if name.startswith(wl) and name.endswith(ext):
+                return p
     for ext in AUDIO_EXTS:
-        for p in base.glob(f"*{wl}*{ext}"):
-            return p
+        for name, p in index.items():
+            if wl in name and name.endswith(ext):
+                return p
     return None
 
-def play_local_audio_loop(path: Path, times: int = 3, gap_ms: int = 850, playback_rate: float = 1.0):
-    """Loop a local audio file N times with a gap between plays (embeds data: URI)."""
-    ext = path.suffix.lower()
-    mime = (
-        "audio/mpeg" if ext == ".mp3" else
-        "audio/wav"  if ext == ".wav" else
-        "audio/mp4"
-    )
+def find_local_audio_for_word(word: str) -> Path | None:
+    base = get_audio_dir()
     try:
-        b64 = base64.b64encode(path.read_bytes()).decode("utf-8")
-    except Exception:
+        mtime_ns = base.stat().st_mtime_ns
+    except OSError:
+        return None
+    hit = _find_local_audio_cached(word.lower(), str(base), mtime_ns)
+    return Path(hit) if hit else None
+
+def play_local_audio_loop(path: Path, times: int = 3, gap_ms: int = 850, playback_rate: float = 1.0):
+    """Loop a local audio file N times with a gap between plays."""
+    src = _audio_src(path)
+    if src is None:
         st.warning(f"Couldn't read audio file: {path}")
         return
-    st.components.v1.html(
-        f"""
-        <script>
-          (function() {{
-            var times = {times};
-            var count = 0;
-            var gap = {gap_ms};
-            var rate = {playback_rate};
-            var src = 'data:{mime};base64,{b64}';
-            var audio = new Audio(src);
-            audio.playbackRate = rate;
-            audio.addEventListener('ended', function() {{
-              count += 1;
-              if (count < times) {{
-                setTimeout(function() {{ audio.currentTime = 0; audio.play(); }}, gap);
-              }}
-            }});
-            audio.play();
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+    _mw_call(f"mw.playLoop({json.dumps(src)}, {times}, {gap_ms}, {playback_rate});")
 
 # ---------------------- Sentence Helpers ----------------------
 SENTENCE_OVERRIDES = {
@@ -299,87 +581,49 @@ SENTENCE_OVERRIDES = {
     "you": "You can do it.",
 }
 
+_NO_ARTICLE = frozenset({
+    "many", "few", "some", "none", "one", "two", "three",
+    "she", "he", "they", "we", "it", "and", "or", "for", "then", "is",
+})
+
+@lru_cache(maxsize=256)
 def a_or_an(word: str) -> str:
     return "an" if word[:1].lower() in "aeiou" else "a"
 
+@lru_cache(maxsize=512)
 def build_sentence(word: str) -> str:
     w = word.lower()
-    if w in SENTENCE_OVERRIDES:
-        return SENTENCE_OVERRIDES[w]
-    no_article = {"many", "few", "some", "none", "one", "two", "three", "she", "he", "they", "we", "it", "and", "or", "for", "then", "is"}
-    if w in no_article:
+    override = SENTENCE_OVERRIDES.get(w)
+    if override is not None:
+        return override
+    if w in _NO_ARTICLE:
         return f"We can use the word '{word}'."
     return f"I see {a_or_an(w)} {word}."
 
 # --- Browser SpeechSynthesis fallback (when no local file) ---
 
 def say_word_repeat(word: str, times: int = 3, rate: float = 0.8, gap_ms: int = 850):
-    st.components.v1.html(
-        f"""
-        <script>
-          (function() {{
-            const txt = {word!r};
-            const times = {times};
-            const gap = {gap_ms};
-            const rate = {rate};
-            let i = 0;
-            function speakOne() {{
-              const u = new SpeechSynthesisUtterance(txt);
-              u.lang = 'en-US';
-              u.rate = rate;
-              u.pitch = 1.0;
-              u.onend = () => {{
-                i += 1;
-                if (i < times) setTimeout(speakOne, gap);
-              }};
-              try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-              speechSynthesis.speak(u);
-            }}
-            try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-            speakOne();
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+    _mw_call(f"mw.sayRepeat({json.dumps(word, ensure_ascii=False)}, {times}, {rate}, {gap_ms});")
 
 def say_sentence(word: str, delay_ms: int = 0, rate: float = 0.85):
-    sentence = build_sentence(word)
-    st.components.v1.html(
-        f"""
-        <script>
-          (function() {{
-            const sentence = {sentence!r};
-            const delay = Math.max(30, {delay_ms});
-            const rate = {rate};
-            function speak() {{
-              try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-              const u = new SpeechSynthesisUtterance(sentence);
-              u.lang = 'en-US';
-              u.rate = rate;   // slower for kinders if requested
-              u.pitch = 0.95;
-              speechSynthesis.speak(u);
-            }}
-            try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-            setTimeout(speak, delay);
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+    sentence = _sentence_bundle(word)[0]
+    _mw_call(f"mw.saySentence({json.dumps(sentence, ensure_ascii=False)}, {delay_ms}, {rate});")
 
-HAS_GTTS = False
-try:
-    from gtts import gTTS  # optional, only for sentence file generation
-    HAS_GTTS = True
-except Exception:
-    HAS_GTTS = False
+@lru_cache(maxsize=1)
+def _gtts():
+    """Import gTTS on first use (it drags in requests + TLS, so keep it off cold start)."""
+    try:
+        from gtts import gTTS  # optional, only for sentence file generation
+        return gTTS
+    except Exception:
+        return None
 
 
-def say_sentence_on_click(word: str, kinder: bool):
-    # If user prefers local sentence audio and a file exists, play it; else browser TTS
+def say_sentence_on_click(word: str, kinder: bool, sentence_path: Path | None = None):
+    # If user prefers local sentence audio and a file exists, play it; else browser TTS.
+    # Callers that already resolved the file this render pass it in via sentence_path.
     if st.session_state.get("prefer_local_sentence_audio", True):
-        p = find_local_sentence_audio(word)
+        p = sentence_path if sentence_path is not None else find_local_sentence_audio(word)
         if p is not None:
             play_local_audio_once(p, playback_rate=(0.6 if kinder else 1.0))
             return
@@ -389,167 +633,104 @@ def say_sentence_on_click(word: str, kinder: bool):
 # --- Short feedback speaker (browser TTS) ---
 
 
-def say_feedback(text: str, kinder: bool = False):
+def _feedback_js(text: str, kinder: bool = False) -> str:
     rate = 0.6 if kinder else 0.95
-    safe = text.replace("\\", "\\\\").replace("'", "\\'")
-    st.components.v1.html(
-        f"""
-        <script>
-          (function() {{
-            try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-            const u = new SpeechSynthesisUtterance('{safe}');
-            u.lang = 'en-US'; u.rate = {rate}; u.pitch = 1.0;
-            speechSynthesis.speak(u);
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+    return f"mw.sayFeedback({json.dumps(text, ensure_ascii=False)}, {rate});"
+
+def say_feedback(text: str, kinder: bool = False):
+    _mw_call(_feedback_js(text, kinder))
 
 # --- Confetti celebration (canvas-confetti) ---
 
 def confetti_burst():
-    st.components.v1.html(
-        """
-        <script src="https://cdn.jsdelivr.net/npm/canvas-confetti@1.6.0/dist/confetti.browser.min.js"></script>
-        <script>
-          (function() {
-            try {
-              // main burst
-              confetti({ particleCount: 120, spread: 70, origin: { y: 0.6 } });
-              // secondary burst for fuller feel
-              setTimeout(() => confetti({ particleCount: 90, spread: 100, startVelocity: 45, origin: { y: 0.7 } }), 200);
-            } catch (e) {}
-          })();
-        </script>
-        """,
-        height=0,
-    )
+    _mw_call("mw.confetti();")
 
 # --- Super‑clear sentence helpers (word‑by‑word, optional spell‑out) ---
 
-def _js_escape(s: str) -> str:
-    return s.replace("\\", "\\\\").replace("'", "\\'")
+@lru_cache(maxsize=512)
+def _letters_text(word: str) -> str:
+    return " ".join(word.upper())
 
 def say_letters_word(word: str, letter_gap_ms: int = 350, rate: float = 0.35):
-    letters = " ".join(list(word.upper()))
-    js_text = _js_escape(letters)
-    st.components.v1.html(
-        f"""
-        <script>
-          (function() {{
-            const txt = '{js_text}';
-            const parts = txt.split(' ');
-            const gap = {letter_gap_ms};
-            const rate = {rate};
-            let i = 0;
-            function speakOne() {{
-              if (i >= parts.length) return;
-              const u = new SpeechSynthesisUtterance(parts[i]);
-              u.lang = 'en-US';
-              u.rate = rate;
-              u.pitch = 1.0;
-              u.onend = () => {{ i += 1; setTimeout(speakOne, gap); }};
-              try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-              speechSynthesis.speak(u);
-            }}
-            try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-            speakOne();
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+    _mw_call(f"mw.sayLetters({json.dumps(_letters_text(word))}, {letter_gap_ms}, {rate});")
+
+@st.cache_data(show_spinner=False)
+def _sentence_bundle(word: str) -> tuple[str, str, str]:
+    # Sentence + ready-to-inline JS literals are pure functions of the word;
+    # build once instead of re-splitting/re-escaping on every rerun.
+    # json.dumps emits the array/string literals in one C call and is correct
+    # for all Unicode, unlike hand-rolled replace() escaping.
+    s = build_sentence(word)
+    return s, json.dumps(s.split(), ensure_ascii=False), json.dumps(word, ensure_ascii=False)
+
 
 def say_super_clear_sentence(word: str, kinder: bool, gap_ms: int = 450, pre_repeat: int = 2, rate: float | None = None):
     # Speak the target word slowly a couple times, then the sentence word-by-word with short gaps
-    sentence = build_sentence(word)
-    tokens = sentence.split()
+    _, js_tokens, w = _sentence_bundle(word)
     r = (0.35 if kinder else 0.7) if rate is None else rate
-    js_tokens = [_js_escape(t) for t in tokens]
-    w = _js_escape(word)
-    st.components.v1.html(
-        f"""
-        <script>
-          (function() {{
-            const gap = {gap_ms};
-            const rate = {r};
-            const target = '{w}';
-            const tokens = {js_tokens};
-            let phase = 0; // 0 = pre repeats, 1 = sentence
-            let preLeft = {pre_repeat};
-            let i = 0;
-            function speakNext() {{
-              try {{ speechSynthesis.cancel(); }} catch (e) {{}}
-              if (phase === 0) {{
-                if (preLeft <= 0) {{ phase = 1; return setTimeout(speakNext, gap); }}
-                const u = new SpeechSynthesisUtterance(target);
-                u.lang = 'en-US'; u.rate = rate; u.pitch = 1.0;
-                u.onend = () => {{ preLeft--; setTimeout(speakNext, gap); }};
-                speechSynthesis.speak(u);
-                return;
-              }}
-              if (i >= tokens.length) return;
-              const u = new SpeechSynthesisUtterance(tokens[i]);
-              u.lang = 'en-US'; u.rate = rate; u.pitch = 1.0;
-              u.onend = () => {{ i++; setTimeout(speakNext, gap); }};
-              speechSynthesis.speak(u);
-            }}
-            speakNext();
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+    _mw_call(f"mw.sayClear({w}, {js_tokens}, {gap_ms}, {r}, {pre_repeat});")
+
+# ---------------------- Answer canonicalization ----------------------
+# ASCII whitespace plus the Unicode whitespace NFKC does NOT fold to U+0020
+# (NEL, ogham space, and the line/paragraph separators str.split() stripped
+# in the baseline; U+2028/29 are common paste artifacts). The NBSP variants
+# need no entry — NFKC already normalizes them to a plain space.
+_WS_TABLE = dict.fromkeys(map(ord, string.whitespace + "\u0085\u1680\u2028\u2029"))
+
+@lru_cache(maxsize=512)
+def _canonical(s: str) -> str:
+    # Single translate pass instead of split+join, casefold instead of lower
+    # (handles \u00df/\u03a3-style foldings); cached so each word's target form is
+    # computed once, not on every submit.
+    return unicodedata.normalize("NFKC", s).translate(_WS_TABLE).casefold()
+
+@st.cache_data(show_spinner=False)
+def _canon_words(words: tuple[str, ...]) -> list[str]:
+    # Canonical form of every list word, computed once per word list so the
+    # submit handler indexes into it instead of normalizing the target.
+    return [_canonical(w) for w in words]
 
 # ---------------------- State -------------------------
 
-def init_state():
-    ss = st.session_state
-    if "words" not in ss:
-        ss.words = DEFAULT_WORDS.copy()
-    if "idx" not in ss:
-        ss.idx = 0
-    if "attempted_penalty" not in ss:
-        ss.attempted_penalty = False  # kept for compatibility; not used in simplified mode
-    if "total_points" not in ss:
-        ss.total_points = len(ss.words)
-    if "current_points" not in ss:
-        ss.current_points = 0
-    if "listen_nonce" not in ss:
-        ss.listen_nonce = 0
-    if "last_feedback" not in ss:
-        ss.last_feedback = ""
-    if "auto_play" not in ss:
-        ss.auto_play = False  # default to manual playback; Say 3× required
-    if "last_spoken_idx" not in ss:
-        ss.last_spoken_idx = -1
-    if "_retry_speak" not in ss:
-        ss._retry_speak = False  # kept for compatibility; not used in simplified mode
-    if "sentence_audio_dir" not in ss:
-        ss.sentence_audio_dir = str(SENT_AUDIO_DIR_DEFAULT)
-    if "prefer_local_sentence_audio" not in ss:
-        ss.prefer_local_sentence_audio = True
-    if "suppress_autoplay_once" not in ss:
-        ss.suppress_autoplay_once = False
-
+# One defaults table instead of 18 separate `if "x" not in ss` blocks.
+# Callables are invoked on first use so mutable defaults aren't shared and
+# derived values (points, joined text) see the words list set just above them.
+_STATE_DEFAULTS = {
+    "words": DEFAULT_WORDS.copy,
+    "idx": 0,
+    "attempted_penalty": False,  # kept for compatibility; not used in simplified mode
+    "total_points": lambda: len(st.session_state.words),
+    "current_points": 0,
+    "last_feedback": "",
+    "auto_play": False,  # default to manual playback; Say 3× required
+    "last_spoken_idx": -1,
+    "_retry_speak": False,  # kept for compatibility; not used in simplified mode
+    "sentence_audio_dir": lambda: str(SENT_AUDIO_DIR_DEFAULT),
+    "prefer_local_sentence_audio": True,
+    "suppress_autoplay_once": False,
     # Track last processed upload to avoid reprocessing on rerun
-    if "last_upload_key" not in ss:
-        ss.last_upload_key = None
-
+    "last_upload_key": None,
     # Feedback/visuals flags for next render
-    if "pending_feedback" not in ss:
-        ss.pending_feedback = None  # 'right' | 'wrong' | None
-    if "pending_confetti" not in ss:
-        ss.pending_confetti = False
+    "pending_feedback": None,  # 'right' | 'wrong' | None
+    "pending_confetti": False,
+    # Sidebar textarea contents; rebuilt only when the word list changes
+    "_words_joined": lambda: "\n".join(st.session_state.words),
+}
+
+def init_state():
+    ss = st.session_state
+    for k, v in _STATE_DEFAULTS.items():
+        if k not in ss:
+            ss[k] = v() if callable(v) else v
 
 init_state()
+_install_mw_helpers()
 
 # ---------------------- Sidebar -----------------------
 st.sidebar.header("Spelling List (Teacher)")
 raw = st.sidebar.text_area(
     "Paste words (one per line or commas)",
-    value="\n".join(st.session_state.words),
+    value=st.session_state._words_joined,
     height=160,
 )
 
@@ -557,136 +738,155 @@ def parse_words(raw: str) -> List[str]:
     parts = [p.strip() for p in raw.replace(",", "\n").splitlines()]
     return [p for p in parts if p]
 
+def _reset_game_state(words: List[str] | None = None, *, extra: dict | None = None):
+    """Reset the per-round counters in one session_state.update() and rerun.
+
+    Pass `words` to install a new list (points/textarea follow along);
+    `extra` carries the handful of keys individual callers differ on.
+    """
+    ss = st.session_state
+    updates = {
+        "idx": 0,
+        "current_points": 0,
+        "attempted_penalty": False,
+        "last_feedback": "",
+        "last_spoken_idx": -1,
+        "_retry_speak": False,
+        "auto_play": False,
+        "_end_confetti_done": False,
+    }
+    if words is not None:
+        updates.update({
+            "words": words,
+            "_words_joined": "\n".join(words),
+            "total_points": len(words),
+        })
+    if extra:
+        updates.update(extra)
+    ss.update(updates)
+    st.rerun()
+
 col_a, col_b, col_c = st.sidebar.columns(3)
 if col_a.button("Load list", use_container_width=True):
-    st.session_state.words = parse_words(raw)
-    st.session_state.idx = 0
-    st.session_state.total_points = len(st.session_state.words)
-    st.session_state.current_points = 0
-    st.session_state.attempted_penalty = False
-    st.session_state.last_feedback = ""
-    st.session_state.last_spoken_idx = -1
-    st.session_state._retry_speak = False
-    st.session_state.listen_nonce += 1
-    st.session_state.auto_play = False
-    st.rerun()
+    _reset_game_state(parse_words(raw))
 if col_b.button("Restart", use_container_width=True):
-    st.session_state.idx = 0
-    st.session_state.current_points = 0
-    st.session_state.attempted_penalty = False
-    st.session_state.last_feedback = ""
-    st.session_state.last_spoken_idx = -1
-    st.session_state._retry_speak = False
-    st.session_state.listen_nonce += 1
-    st.session_state.auto_play = False
-    st.rerun()
+    _reset_game_state()
 # NEW: Clear & Load ensures only the new list is in memory and resets any prior upload key/state
 if col_c.button("Clear & Load", use_container_width=True):
     new_words = parse_words(raw)
     st.session_state.clear()  # wipe all prior list/session counters
     init_state()              # restore base keys
-    st.session_state.words = new_words
-    st.session_state.idx = 0
-    st.session_state.total_points = len(new_words)
-    st.session_state.current_points = 0
-    st.session_state.last_upload_key = None
-    st.session_state.last_feedback = ""
-    st.session_state.last_spoken_idx = -1
-    st.session_state.listen_nonce += 1
-    st.session_state.auto_play = False
-    st.session_state.suppress_autoplay_once = True
-    st.rerun()
+    _reset_game_state(new_words, extra={
+        "last_upload_key": None,
+        "suppress_autoplay_once": True,
+    })
 
 # --- File uploader for word lists (.txt, .csv, .pdf) ---
 uploaded = st.sidebar.file_uploader("Upload word list (.txt, .csv, .pdf)", type=["txt","csv","pdf"])
 
+# Map non-letter ASCII (apostrophe excepted) to space: one C-level translate +
+# split replaces the regex engine on large uploads. The ascii-encode pass
+# first turns every non-ASCII character into '?' (-> space), so curly quotes
+# and accents act as separators exactly like the old [^A-Za-z']+ split did.
+_XLAT = {i: (chr(i) if chr(i).isalpha() or chr(i) == "'" else " ") for i in range(128)}
+
 def parse_text_to_words(text: str):
-    # Normalize: -> lower, split on non-alpha, keep short alpha tokens
-    tokens = re.split(r"[^A-Za-z']+", text)
-    words = []
-    for t in tokens:
-        if not t:
-            continue
-        w = t.strip().lower()
-        if w.isalpha() and 1 <= len(w) <= 12:
-            words.append(w)
-    return words
+    # Normalize: -> lower, split on non-alpha, keep short alpha tokens.
+    # Lowercase the whole text in one C call rather than per token.
+    if not text.isascii():
+        text = text.encode("ascii", errors="replace").decode()
+    return [
+        w for w in text.translate(_XLAT).lower().split()
+        if w.isalpha() and 1 <= len(w) <= 12
+    ]
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _parse_upload(name: str, raw_bytes: bytes) -> list[str]:
+    """Parse an uploaded .txt/.csv/.pdf into a clean word list.
+
+    Cached on (name, bytes) so reruns with the same UploadedFile skip the
+    PDF/CSV parse entirely instead of redoing it per interaction.
+    """
+    final_words = []
+    if name.endswith(".txt"):
+        raw = raw_bytes.decode("utf-8", errors="ignore")
+        final_words = parse_text_to_words(raw)
+    elif name.endswith(".csv"):
+        raw = raw_bytes.decode("utf-8", errors="ignore")
+        rows = list(csv.reader(io.StringIO(raw)))
+        if rows:
+            # choose best column by most short word-like tokens;
+            # tokenize each cell exactly once instead of re-parsing
+            # every column's joined text and then the winner again
+            n_cols = max(len(r) for r in rows)
+            col_scores = [0] * n_cols
+            col_words = [[] for _ in range(n_cols)]
+            for row in rows:
+                for j, cell in enumerate(row):
+                    for w in parse_text_to_words(cell):
+                        col_words[j].append(w)
+                        if len(w) <= 10:
+                            col_scores[j] += 1
+            if n_cols:
+                best = max(range(n_cols), key=col_scores.__getitem__)
+                final_words = col_words[best]
+    elif name.endswith(".pdf"):
+        # Tokenize page-by-page: avoids the quadratic `text +=` concat
+        # and never materializes the whole document as one string.
+        # Stop once we have far more tokens than any word list needs,
+        # so a huge PDF doesn't grind through every page.
+        token_budget = 500
+        # try pdfplumber first for better layout
+        try:
+            import pdfplumber
+            with pdfplumber.open(io.BytesIO(raw_bytes)) as pdf:
+                for page in pdf.pages:
+                    final_words.extend(parse_text_to_words(page.extract_text() or ""))
+                    if len(final_words) >= token_budget:
+                        break
+        except Exception:
+            final_words = []
+            try:
+                from PyPDF2 import PdfReader
+                reader = PdfReader(io.BytesIO(raw_bytes))
+                for p in reader.pages:
+                    final_words.extend(parse_text_to_words(p.extract_text() or ""))
+                    if len(final_words) >= token_budget:
+                        break
+            except Exception:
+                final_words = []
+
+    # Dedupe while preserving order; keep first‑grade friendly length.
+    # parse_text_to_words already guarantees alpha tokens of length 1-12,
+    # so only the tighter length cap needs re-checking here.
+    return list(dict.fromkeys(w for w in final_words if len(w) <= 10))
 
 if uploaded is not None:
     name = uploaded.name.lower()
     raw_bytes = uploaded.getvalue()
-    key = (name, len(raw_bytes))
+    key = (name, len(raw_bytes), hashlib.blake2b(raw_bytes, digest_size=8).hexdigest())
 
-    # Avoid re-parsing the same uploaded file on rerun
+    # Avoid re-loading the same uploaded file on rerun
     if st.session_state.get("last_upload_key") == key:
         pass  # do nothing; already loaded
     else:
-        final_words = []
         try:
-            if name.endswith(".txt"):
-                raw = raw_bytes.decode("utf-8", errors="ignore")
-                final_words = parse_text_to_words(raw)
-            elif name.endswith(".csv"):
-                raw = raw_bytes.decode("utf-8", errors="ignore")
-                rows = list(csv.reader(io.StringIO(raw)))
-                if rows:
-                    # choose best column by most short word-like tokens
-                    cols = list(zip(*rows))
-                    best_col = None; best_score = -1
-                    for col in cols:
-                        s = " ".join(col)
-                        ws = parse_text_to_words(s)
-                        score = sum(1 for w in ws if 1 <= len(w) <= 10)
-                        if score > best_score:
-                            best_score = score; best_col = col
-                    if best_col:
-                        buf = " ".join(best_col)
-                        final_words = parse_text_to_words(buf)
-            elif name.endswith(".pdf"):
-                text = ""
-                # try pdfplumber first for better layout
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(io.BytesIO(raw_bytes)) as pdf:
-                        for page in pdf.pages:
-                            text += "\n" + (page.extract_text() or "")
-                except Exception:
-                    try:
-                        from PyPDF2 import PdfReader
-                        reader = PdfReader(io.BytesIO(raw_bytes))
-                        for p in reader.pages:
-                            text += "\n" + (p.extract_text() or "")
-                    except Exception:
-                        text = ""
-                final_words = parse_text_to_words(text)
+            cleaned = _parse_upload(name, raw_bytes)
         except Exception as e:
             st.sidebar.error(f"Failed to parse file: {e}")
-            final_words = []
-
-        # Dedupe while preserving order; keep first‑grade friendly length
-        seen = set(); cleaned = []
-        for w in final_words:
-            if 1 <= len(w) <= 10 and w.isalpha() and w not in seen:
-                seen.add(w); cleaned.append(w)
+            cleaned = []
 
         if cleaned:
-            st.session_state.words = cleaned
-            st.session_state.idx = 0
-            st.session_state.total_points = len(cleaned)
-            st.session_state.current_points = 0
-            st.session_state.last_feedback = ""
-            st.session_state.last_spoken_idx = -1
-            st.session_state.listen_nonce += 1
-            st.session_state.auto_play = False
-            st.session_state.suppress_autoplay_once = True  # require teacher to click Say 3×
-            st.session_state.last_upload_key = key
             st.success(f"Loaded {len(cleaned)} words from {uploaded.name}")
-            st.rerun()
+            _reset_game_state(cleaned, extra={
+                "suppress_autoplay_once": True,  # require teacher to click Say 3×
+                "last_upload_key": key,
+            })
         else:
             st.sidebar.warning("No valid words found in the uploaded file.")
 
 st.sidebar.markdown("---")
-st.sidebar.caption("Tip: After each answer, click **Say 3×** to hear the next word. The Sentence button is optional.")
+st.sidebar.caption("Tip: After each answer, click **Say Word 3×** to hear the next word. The Sentence button is optional.")
 st.session_state.audio_dir = st.sidebar.text_input(
     "Local audio folder (mp3s)",
     value=str(st.session_state.get("audio_dir", AUDIO_DIR_DEFAULT)),
@@ -698,6 +898,48 @@ force_local = st.sidebar.checkbox(
 )
 st.sidebar.checkbox("Auto play each word (3× then sentence)", value=st.session_state.auto_play, key="auto_play")
 kinder = st.sidebar.checkbox("Kindergarten Mode (very slow)", value=False, help="Speak extra-slow like to a 5-year-old.")
+silent_mode = st.sidebar.checkbox(
+    "Silent mode (fast drilling)",
+    value=False,
+    help="Skip feedback speech, confetti and sound effects on answers; just score and move on.",
+)
+# Optional: synthesize missing word mp3s once, so every "Say 3×" plays a
+# cached local file instead of paying SpeechSynthesis startup each time
+if st.sidebar.button("Generate TTS word files for this list"):
+    gTTS = _gtts()
+    if gTTS is None:
+        st.sidebar.warning("gTTS is not installed — `pip install gTTS` to enable this.")
+    else:
+        outdir = get_audio_dir()
+        outdir.mkdir(parents=True, exist_ok=True)
+        made, fails = 0, []
+
+        def _gen_word_file(w: str):
+            mp = outdir / f"{w.lower()}.mp3"
+            try:
+                # skip files we already generated; re-fetch empty/failed saves
+                if mp.stat().st_size > 0:
+                    return
+            except OSError:
+                pass
+            gTTS(text=w, lang="en", slow=True).save(str(mp))
+
+        # each gTTS call blocks on a network round-trip, so run them concurrently
+        progress = st.sidebar.progress(0.0)
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            futs = {ex.submit(_gen_word_file, w): w for w in st.session_state.words}
+            for done, f in enumerate(as_completed(futs), start=1):
+                try:
+                    f.result()
+                    made += 1
+                except Exception:
+                    fails.append(futs[f])
+                progress.progress(done / len(futs))
+        progress.empty()
+        if made:
+            st.success(f"Generated {made} word file(s) in {outdir}")
+        if fails:
+            st.warning("Failed: " + ", ".join(fails))
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("Sentence Audio")
@@ -710,23 +952,42 @@ st.sidebar.checkbox(
     value=st.session_state.get("prefer_local_sentence_audio", True),
     key="prefer_local_sentence_audio",
 )
-# Optional: one-click TTS generation for sentences
-if HAS_GTTS and st.sidebar.button("Generate TTS sentence files for this list"):
-    outdir = get_sentence_audio_dir()
-    outdir.mkdir(parents=True, exist_ok=True)
-    made, fails = 0, []
-    for w in st.session_state.words:
-        try:
-            text = build_sentence(w)
+# Optional: one-click TTS generation for sentences (gtts imported on demand)
+if st.sidebar.button("Generate TTS sentence files for this list"):
+    gTTS = _gtts()
+    if gTTS is None:
+        st.sidebar.warning("gTTS is not installed — `pip install gTTS` to enable this.")
+    else:
+        outdir = get_sentence_audio_dir()
+        outdir.mkdir(parents=True, exist_ok=True)
+        made, fails = 0, []
+
+        def _gen_sentence_file(w: str):
             mp = outdir / f"{w.lower()}_sentence.mp3"
-            gTTS(text=text, lang="en", slow=True).save(str(mp))
-            made += 1
-        except Exception as e:
-            fails.append(w)
-    if made:
-        st.success(f"Generated {made} sentence file(s) in {outdir}")
-    if fails:
-        st.warning("Failed: " + ", ".join(fails))
+            try:
+                # skip files we already generated; re-fetch empty/failed saves
+                if mp.stat().st_size > 0:
+                    return
+            except OSError:
+                pass
+            gTTS(text=build_sentence(w), lang="en", slow=True).save(str(mp))
+
+        # each gTTS call blocks on a network round-trip, so run them concurrently
+        progress = st.sidebar.progress(0.0)
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            futs = {ex.submit(_gen_sentence_file, w): w for w in st.session_state.words}
+            for done, f in enumerate(as_completed(futs), start=1):
+                try:
+                    f.result()
+                    made += 1
+                except Exception:
+                    fails.append(futs[f])
+                progress.progress(done / len(futs))
+        progress.empty()
+        if made:
+            st.success(f"Generated {made} sentence file(s) in {outdir}")
+        if fails:
+            st.warning("Failed: " + ", ".join(fails))
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("Clarity Options")
@@ -742,9 +1003,10 @@ st.session_state.pre_repeat = int(pre_repeat)
 
 # ---------------------- Main UI -----------------------
 st.title("🪐 Jupiter Points — Spelling Game")
-st.caption("Type the spelling and press Check. After feedback, click **Say 3×** to hear the next word.")
+st.caption("Type the spelling and press Check. After feedback, click **Say Word 3×** to hear the next word.")
 
 wds = st.session_state.words
+canon_wds = _canon_words(tuple(wds))
 N = len(wds)
 idx = st.session_state.idx
 points = st.session_state.current_points
@@ -754,146 +1016,53 @@ st.markdown(f"**Word:** {idx+1} / {N}")
 
 # --- Bucket UI and gold bar drop animation ---
 
-def render_bucket_ui(current: int, total: int):
-    # Render a small bucket with visually stacked gold bars (scaled to fit)
-    # We cap the visible bars to avoid overflow and shrink bar height accordingly
+@lru_cache(maxsize=64)
+def _bucket_html(current: int, total: int) -> str:
+    # Identical (current, total) states produce identical markup, so build
+    # the string once; unchanged states then hand Streamlit the same object
+    # and its element diff sends nothing new to the front end. (Skipping the
+    # st.markdown call entirely isn't possible — an element that isn't
+    # re-emitted during a run is removed from the page.)
     cap = max(6, min(total, 20))  # between 6 and 20 visible slices
     bar_h = max(3, int(36 / cap))  # px height per bar inside ~46px bucket
     visible = min(current, cap)
-    bars_html = "".join(
-        [
-            f"<div class='gbar' style='height:{bar_h}px'></div>" for _ in range(visible)
-        ]
-    )
-    st.components.v1.html(
-        f"""
-        <style>
-          .bucket-wrap {{ display:flex; align-items:center; gap:8px; margin:6px 0 10px 0; }}
-          .bucket {{ position:relative; width:56px; height:56px; border-radius:6px; border:2px solid #999;
-                     background:#f5f5f5; box-shadow: inset 0 0 8px rgba(0,0,0,0.08); overflow:hidden; }}
-          .bucket-inner {{ position:absolute; left:6px; right:6px; bottom:6px; top:14px;
-                           display:flex; flex-direction:column-reverse; align-items:center; gap:2px; }}
-          .bucket-lip {{ position:absolute; left:8px; right:8px; top:4px; height:6px; border-radius:3px;
-                         background:linear-gradient(180deg,#ddd,#bbb); border:1px solid #aaa; }}
-          .gbar {{ width:80%; border-radius:3px; background:linear-gradient(180deg,#ffd54f,#fbc02d);
-                   border:1px solid #b28900; box-shadow: 0 1px 2px rgba(0,0,0,0.15); }}
-          .bucket-label {{ font-weight:600; }}
-        </style>
-        <div class='bucket-wrap'>
-          <div id='bucket' class='bucket'>
-            <div class='bucket-lip'></div>
-            <div class='bucket-inner'>
-              {bars_html}
-            </div>
-          </div>
-          <div class='bucket-label'>Jupiter Dollars in bucket: {current}</div>
-        </div>
-        """,
-        height=70,
+    # all bars are identical, so repeat one literal instead of join-ing a list
+    bars_html = f"<div class='gbar' style='height:{bar_h}px'></div>" * visible
+    # Single line on purpose: with zero bars the multi-line template left a
+    # blank line inside .bucket-inner, and the markdown parser then closed
+    # the HTML block early and rendered the trailing </div>s as a code block.
+    return (
+        "<div class='bucket-wrap'>"
+        "<div id='bucket' class='bucket'>"
+        "<div class='bucket-lip'></div>"
+        f"<div class='bucket-inner'>{bars_html}</div>"
+        "</div>"
+        f"<div class='bucket-label'>Jupiter Dollars in bucket: {current}</div>"
+        "</div>"
     )
 
-def gold_bar_drop():
-    # Animates a gold bar dropping into the bucket element
-    st.components.v1.html(
-        """
-        <style>
-          @keyframes dropBar { from { transform: translateY(-120px) scale(1); opacity:0.9; } to { transform: translateY(0) scale(1); opacity:1; } }
-        </style>
-        <script>
-          (function(){
-            try {
-              const bucket = document.getElementById('bucket');
-              if(!bucket){ return; }
-              const rect = bucket.getBoundingClientRect();
-              const bar = document.createElement('div');
-              bar.style.position = 'fixed';
-              bar.style.left = (rect.left + rect.width/2 - 16) + 'px';
-              bar.style.top = (rect.top - 20) + 'px';
-              bar.style.width = '32px';
-              bar.style.height = '14px';
-              bar.style.borderRadius = '3px';
-              bar.style.background = 'linear-gradient(180deg,#ffd54f,#fbc02d)';
-              bar.style.border = '1px solid #b28900';
-              bar.style.boxShadow = '0 2px 6px rgba(0,0,0,0.25)';
-              bar.style.zIndex = 9999;
-              document.body.appendChild(bar);
-              bar.animate([{ transform:'translateY(-120px)', opacity:0.9 },{ transform:'translateY(0)', opacity:1 }], { duration: 550, easing: 'cubic-bezier(.2,.7,.2,1)' });
-              setTimeout(()=>{ bar.remove(); }, 600);
-            } catch(e){}
-          })();
-        </script>
-        """,
-        height=0,
-    )
-
-# Append a bar inside the visible bucket immediately (no rerun required)
+def render_bucket_ui(current: int, total: int):
+    # Render a small bucket with visually stacked gold bars (scaled to fit).
+    # Plain markup in the parent DOM (styled by the page-level _BUCKET_CSS):
+    # the bucket has no JS of its own, so it doesn't need an iframe, and the
+    # script helpers below reach it via window.parent.document.
+    st.markdown(_bucket_html(current, total), unsafe_allow_html=True)
+
+# Append missing bars inside the visible bucket immediately (no rerun
+# required); mw.bucketAdd diffs against `current`, so this also covers the
+# old bucket_sync_bars reconciliation case. The gold-bar drop animation is
+# its own mw.goldBarDrop() call in the fused submit payload.
 # total: total words (N); current: new current_points after increment
-def bucket_add_bar(total: int, current: int):
-    cap_js = "Math.max(6, Math.min(" + str(total) + ", 20))"
-    st.components.v1.html(
-        f"""
-        <style>
-          .gbar {{ width:80%; border-radius:3px; background:linear-gradient(180deg,#ffd54f,#fbc02d);
-                   border:1px solid #b28900; box-shadow: 0 1px 2px rgba(0,0,0,0.15); }}
-        </style>
-        <script>
-          (function() {{
-            try {{
-              const bucket = document.getElementById('bucket');
-              if(!bucket) return;
-              const inner = bucket.querySelector('.bucket-inner');
-              const label = document.querySelector('.bucket-label');
-              const cap = {cap_js};
-              const barH = Math.max(3, Math.floor(36 / cap));
-              const bar = document.createElement('div');
-              bar.className = 'gbar';
-              bar.style.height = barH + 'px';
-              // insert at bottom of stack (since column-reverse)
-              inner.prepend(bar);
-              if (label) {{ label.textContent = 'Gold in bucket: ' + {current}; }}
-            }} catch(e){{}}
-          }})();
-        </script>
-        """,
-        height=0,
-    )
+def _bucket_add_js(total: int, current: int) -> str:
+    cap = max(6, min(total, 20))   # clamp here, not per call in JS
+    bar_h = max(3, 36 // cap)      # same geometry as _bucket_html
+    return f"mw.bucketAdd({cap}, {bar_h}, {current});"
 
-# Ensure the bucket's stacked bars match the current count (adds missing bars if needed)
-def bucket_sync_bars(total: int, current: int):
-    cap_js = "Math.max(6, Math.min(" + str(total) + ", 20))"
-    st.components.v1.html(
-        f"""
-        <script>
-          (function(){{
-            try {{
-              const bucket = document.getElementById('bucket');
-              if(!bucket) return;
-              const inner = bucket.querySelector('.bucket-inner');
-              const label = document.querySelector('.bucket-label');
-              const cap = {cap_js};
-              const target = Math.min({current}, cap);
-              const barH = Math.max(3, Math.floor(36 / cap));
-              let have = inner ? inner.children.length : 0;
-              while(inner && have < target) {{
-                const b = document.createElement('div');
-                b.className = 'gbar';
-                b.style.height = barH + 'px';
-                inner.prepend(b);
-                have++;
-              }}
-              if (label) {{ label.textContent = 'Gold in bucket: ' + {current}; }}
-            }} catch(e){{}}
-          }})();
-        </script>
-        """,
-        height=0,
-    )
-
-# Create/update a persistent placeholder so we can re-render the bucket immediately after submit
-if 'bucket_ph' not in st.session_state:
-    st.session_state.bucket_ph = st.empty()
-with st.session_state.bucket_ph:
-    render_bucket_ui(points, N)
+# Render the bucket in place. The old session-persisted st.empty()
+# placeholder existed so the submit handler could re-render it mid-rerun;
+# submits now update the bucket client-side (mw.bucketAdd), and holding a
+# DeltaGenerator across runs was fragile anyway.
+render_bucket_ui(points, N)
 
 # Small note about audio sources
 st.caption("Word uses local audio when available; Sentence uses local sentence audio (if provided) or the browser voice.")
@@ -908,123 +1077,184 @@ if idx >= N:
         st.session_state.current_points = 0
         st.session_state.last_feedback = ""
         st.session_state.last_spoken_idx = -1
-        st.session_state.listen_nonce += 1
+        st.session_state._end_confetti_done = False
     if col_r2.button("Edit word list", use_container_width=True):
         pass  # no-op, just leaves them on the page to edit sidebar list
-    st.balloons()
+    # Celebrate through the persistent confetti helper instead of
+    # st.balloons(): no dedicated animation subtree, and only once per
+    # completion rather than on every rerun of this summary screen.
+    if not st.session_state.get("_end_confetti_done"):
+        st.session_state._end_confetti_done = True
+        confetti_burst()
+    _flush_mw_calls()  # st.stop() skips the end-of-script flush
     st.stop()
 
 word = wds[idx]
 
-# Show which local file will be used (if any) — prepare text, render inside the first container to reduce spacing
+# Resolve the word's local audio (and sentence audio) once per render; the
+# autoplay branch and all the playback buttons below reuse these.
 p_preview = find_local_audio_for_word(word)
+p_sentence = find_local_sentence_audio(word)
 preview_text = f"Using local audio: {p_preview.name}" if p_preview is not None else ""
 
+# Warm the browser HTTP cache for the NEXT word's audio while the child types,
+# so advancing is instant. Only emitted when the URL changes (once per word).
+if idx + 1 < N:
+    p_next = find_local_audio_for_word(wds[idx + 1])
+    next_url = _static_audio_url(p_next) if p_next is not None else None
+    if next_url is not None and st.session_state.get("_prefetched_url") != next_url:
+        st.session_state._prefetched_url = next_url
+        st.components.v1.html(
+            f'<link rel="prefetch" as="audio" href="{next_url}">', height=0
+        )
+
+
+# One dispatch per playback action; the autoplay branch, the control buttons
+# and the deferred-replay hook all share these two closures (p_preview /
+# p_sentence are the lookups hoisted above), so the local-vs-TTS decision
+# lives in one place.
+def _say_word_3x():
+    if force_local and p_preview is not None:
+        play_local_audio_loop(p_preview, times=3, gap_ms=850, playback_rate=(0.6 if kinder else 1.0))
+    else:
+        say_word_repeat(word, times=3, rate=(0.35 if kinder else 0.8), gap_ms=850)
+
+def _say_sentence_action():
+    if super_clear:
+        if spell_out:
+            say_letters_word(word, letter_gap_ms=350, rate=(0.3 if kinder else 0.5))
+        say_super_clear_sentence(
+            word,
+            kinder=kinder,
+            gap_ms=int(st.session_state.get("sentence_gap", 500)),
+            pre_repeat=int(st.session_state.get("pre_repeat", 2))
+        )
+    else:
+        say_sentence_on_click(word, kinder, p_sentence)
+
+WORD_ACTIONS = {"word": _say_word_3x, "sentence": _say_sentence_action}
+
+# A control button clicked after the word advanced (the guess fragment bumps
+# idx without a full rerun) defers its action here via _pending_say, so it
+# plays the NEW word during the full rerun it triggers.
+_pending = st.session_state.pop("_pending_say", None)
+if _pending in WORD_ACTIONS:
+    WORD_ACTIONS[_pending]()
 
 # Auto play on new word (once per index): say the word 3× only (unless suppressed once)
 if st.session_state.last_spoken_idx != idx:
     if st.session_state.auto_play and not st.session_state.suppress_autoplay_once:
-        p = find_local_audio_for_word(word)
-        if force_local and p is not None:
-            play_local_audio_loop(p, times=3, gap_ms=850, playback_rate=(0.6 if kinder else 1.0))
-        else:
-            say_word_repeat(word, times=3, rate=(0.35 if kinder else 0.8), gap_ms=850)
+        _say_word_3x()
     else:
         # consume the suppression for this word so future words can autoplay again
         st.session_state.suppress_autoplay_once = False
     st.session_state.last_spoken_idx = idx
 
-# Hearing controls
+# Hearing controls: one Word + one Sentence button in a fragment (the old
+# hr1/hr2 "Hear again / Sentence again" pair had identical handlers and is
+# folded in here). Repeats of the current word rerun only the fragment;
+# when idx has moved on, the action defers to the full rerun above.
+@st.fragment
+def _audio_controls():
+    cc1, cc2 = st.columns(2)
+    clicked = None
+    if cc1.button("🔊 Say Word 3×", use_container_width=True):
+        clicked = "word"
+    if cc2.button("🗣️ Sentence", use_container_width=True):
+        clicked = "sentence"
+    if clicked:
+        if st.session_state.idx != idx:
+            st.session_state._pending_say = clicked
+            st.rerun(scope="app")
+        WORD_ACTIONS[clicked]()
+    _flush_mw_calls()
+
 with st.container(border=True):
     st.markdown("<div class='controls-box'>", unsafe_allow_html=True)
     if preview_text:
         st.caption(preview_text)
         st.markdown("<div style='height:2px'></div>", unsafe_allow_html=True)
-    cc1, cc2 = st.columns(2)
-    if cc1.button("🔊 Say Next Word 3×", use_container_width=True):
-        p = find_local_audio_for_word(word)
-        if force_local and p is not None:
-            play_local_audio_loop(p, times=3, gap_ms=850, playback_rate=(0.6 if kinder else 1.0))
-        else:
-            say_word_repeat(word, times=3, rate=(0.35 if kinder else 0.8), gap_ms=850)
-    if cc2.button("🔊 Sentence", use_container_width=True):
-        if super_clear:
-            if spell_out:
-                say_letters_word(word, letter_gap_ms=350, rate=(0.3 if kinder else 0.5))
-            say_super_clear_sentence(
-                word,
-                kinder=kinder,
-                gap_ms=int(st.session_state.get("sentence_gap", 500)),
-                pre_repeat=int(st.session_state.get("pre_repeat", 2))
-            )
-        else:
-            say_sentence_on_click(word, kinder)
+    _audio_controls()
     st.markdown("</div>", unsafe_allow_html=True)
 
-# Input and checking
-st.markdown("**Type the word you heard:**")
-with st.form(key=f"listen_form_{st.session_state.listen_nonce}"):
-    guess = st.text_input("Your spelling", value="", key=f"guess_{st.session_state.listen_nonce}")
-    submitted = st.form_submit_button("Check ✔️")
-
-if submitted:
-    # Canonicalize input and target: normalize Unicode and remove all whitespace
-    g_raw = guess or ""
-    g = ''.join(unicodedata.normalize("NFKC", g_raw).split()).lower()
-    target = ''.join(unicodedata.normalize("NFKC", word).split()).lower()
-
-    correct = (g == target)
-    if correct:
-        # Immediate audio + visuals
-        say_feedback("You got it right!", kinder)
-        confetti_burst()
-        play_ui_sound("cha_ching")
-        gold_bar_drop()
-        st.session_state.current_points += 1
-        # Immediately re-render the bucket with updated count
-        with st.session_state.bucket_ph:
-            render_bucket_ui(st.session_state.current_points, N)
-        st.session_state.last_feedback = "✅ You were right!  —  Click **Say 3×** to hear the next word."
-    else:
-        # Immediate audio for wrong
-        say_feedback("Not quite right, let's move to next word", kinder)
-        st.session_state.last_feedback = "❌ Not quite right — Click **Say Next Word 3×** to hear the next word."
+# Input and checking. A fragment: each guess reruns only this block instead
+# of the whole script (sidebar, bucket, audio lookups). The bucket updates
+# client-side via mw.bucketAdd; the word counter/preview above refresh on the
+# next full rerun, which the flow forces anyway — the child clicks "Say Word
+# 3×" (outside the fragment) to hear the new word.
+@st.fragment
+def _guess_fragment():
+    f_idx = st.session_state.idx
+    if f_idx >= N:
+        return
+    st.markdown("**Type the word you heard:**")
+    # Stable keys + clear_on_submit: the form and its input keep the same
+    # widget identity across rounds (no React unmount/mount per answer);
+    # only the value resets after each Check.
+    with st.form(key="listen_form", clear_on_submit=True):
+        guess = st.text_input("Your spelling", value="", key="guess")
+        submitted = st.form_submit_button("Check ✔️")
+
+    if submitted:
+        # Canonicalize input and target: normalize Unicode and remove all whitespace
+        g = _canonical(guess or "")
+        target = canon_wds[f_idx]
+
+        correct = (g == target)
+        if correct:
+            st.session_state.current_points += 1
+            if silent_mode:
+                # Fast drilling: just the score and the one missing bar
+                _mw_call(_bucket_add_js(N, st.session_state.current_points))
+            else:
+                # Immediate audio + visuals: one component injection for the
+                # whole celebration instead of four separate iframes per
+                # correct answer. mw.bucketAdd appends the one missing bar
+                # client-side, so the full bucket markup is not rebuilt
+                # mid-rerun; the next server render draws it with the updated
+                # count anyway.
+                _mw_call(
+                    _feedback_js("You got it right!", kinder)
+                    + " mw.confetti(); "
+                    + _sfx_js("cha_ching")
+                    + " mw.goldBarDrop(); "
+                    + _bucket_add_js(N, st.session_state.current_points)
+                )
+            st.session_state.last_feedback = "✅ You were right!  —  Click **Say Word 3×** to hear the next word."
+        else:
+            # Immediate audio for wrong
+            if not silent_mode:
+                say_feedback("Not quite right, let's move to next word", kinder)
+            st.session_state.last_feedback = "❌ Not quite right — Click **Say Word 3×** to hear the next word."
 
-    # ensure no delayed playback repeats
-    st.session_state.pending_feedback = None
-    st.session_state.pending_confetti = False
+        # ensure no delayed playback repeats
+        st.session_state.pending_feedback = None
+        st.session_state.pending_confetti = False
 
-    # Require manual playback on next word
-    st.session_state.suppress_autoplay_once = True
+        # Require manual playback on next word
+        st.session_state.suppress_autoplay_once = True
 
-    # Always advance to the next word (form submit already triggers a rerun)
-    st.session_state.idx += 1
-    st.session_state.listen_nonce += 1
-    st.session_state.last_spoken_idx = -1
+        # Always advance to the next word
+        st.session_state.idx += 1
+        st.session_state.last_spoken_idx = -1
 
+        # Finishing the list needs the full page (summary + celebration).
+        # The app rerun re-executes the module and rebinds the pending
+        # queue, so carry the final answer's feedback over through
+        # session_state; the next run re-queues and flushes it.
+        if st.session_state.idx >= N:
+            st.session_state["_mw_carryover"] = list(_mw_pending)
+            _mw_pending.clear()
+            st.rerun(scope="app")
 
+    # Feedback banner (inside the fragment so it updates with each guess)
+    if st.session_state.last_feedback:
+        st.info(st.session_state.last_feedback)
 
-# Feedback banner
-if st.session_state.last_feedback:
-    st.info(st.session_state.last_feedback)
+    _flush_mw_calls()
+
+_guess_fragment()
+
+# Flush whatever the full run queued (autoplay, deferred replays, ...)
+_flush_mw_calls()
 
-# Quick repeats
-hr1, hr2 = st.columns(2)
-if hr1.button("🔁 Hear again (3×)"):
-    p = find_local_audio_for_word(word)
-    if force_local and p is not None:
-        play_local_audio_loop(p, times=3, gap_ms=850, playback_rate=(0.6 if kinder else 1.0))
-    else:
-        say_word_repeat(word, times=3, rate=(0.35 if kinder else 0.8), gap_ms=850)
-if hr2.button("🗣️ Sentence again"):
-    if super_clear:
-        if spell_out:
-            say_letters_word(word, letter_gap_ms=350, rate=(0.3 if kinder else 0.5))
-        say_super_clear_sentence(
-            word,
-            kinder=kinder,
-            gap_ms=int(st.session_state.get("sentence_gap", 500)),
-            pre_repeat=int(st.session_state.get("pre_repeat", 2))
-        )
-    else:
-        say_sentence_on_click(word, kinder)
\ No newline at end of file